@@ -1,16 +1,25 @@
 """
 Generate Ni-film sample data files so that we can demonstrate file loading.
+
+Requires refl1d to be importable, e.g., after "pip install -e ." from the
+top of the source tree.
 """
-import sys;
-sys.path.insert(0,'../../..')
-sys.path.insert(1,'../../../dream')
-sys.path.insert(2,'../..')
+import os
+import importlib.util
+
 from numpy.random import seed
-from sitedoc import SEED
 from refl1d.fitter import load_problem
 from refl1d.snsdata import write_file
 
-seed(SEED)
+# Load the doc seed directly from doc/sitedoc.py rather than adding the
+# doc directory to sys.path.
+_sitedoc_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', '..', 'sitedoc.py')
+_spec = importlib.util.spec_from_file_location("sitedoc", _sitedoc_path)
+sitedoc = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sitedoc)
+
+seed(sitedoc.SEED)
 problem = load_problem('nifilm-tof.py')
 for i,p in enumerate(problem.fitness.probe.probes):
     write_file('nifilm-tof-%d.dat'%(i+1), p, title="Simulated 100 A Ni film")
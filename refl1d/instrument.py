@@ -515,6 +515,34 @@ class Pulsed(object):
         return make_probe(T=T, dT=dT-sample_broadening, L=L, dL=dL,
                           radiation=self.radiation, **kw)
 
+    def _probes(self, T, slits, **kw):
+        """
+        Simulate one measurement probe for each angle in *T* measured
+        with the corresponding slit opening in *slits*.
+
+        Rather than calling :meth:`probe` for each angle, the angles,
+        wavelengths and slits for all measurements are laid out as flat
+        vectors so that the resolution is computed in one pass, and each
+        probe is built from its slice of the result.
+        """
+        low, high = kw.get('wavelength', self.wavelength)
+        dLoL = kw.get('dLoL', self.dLoL)
+        L = bins(low, high, dLoL)
+        dL = binwidths(L)
+        n, k = len(L), len(T)
+        slits = np.asarray(slits, 'd')
+        s1, s2 = (slits, slits) if slits.ndim == 1 else slits.T
+        T, dT, L, dL = self.resolution(
+            L=np.tile(L, k), dL=np.tile(dL, k),
+            T=np.repeat(np.asarray(T, 'd'), n),
+            slits=(np.repeat(s1, n), np.repeat(s2, n)), **kw)
+        sample_broadening = kw.get('sample_broadening', self.sample_broadening)
+        dT = dT - sample_broadening
+        parts = zip(*(np.split(v, k) for v in (T, dT, L, dL)))
+        return [make_probe(T=Ti, dT=dTi, L=Li, dL=dLi,
+                           radiation=self.radiation, **kw)
+                for Ti, dTi, Li, dLi in parts]
+
     def magnetic_probe(self, Aguide=BASE_GUIDE_ANGLE, shared_beam=True, **kw):
         """
         Simulate a polarized measurement probe.
@@ -583,8 +611,7 @@ class Pulsed(object):
 
         # Compute reflectivity with resolution and added noise
         probes = []
-        for Ti, Si in zip(T, slits):
-            probe = self.probe(T=Ti, slits=Si, dLoL=dLoL)
+        for probe in self._probes(T=T, slits=slits, dLoL=dLoL):
             probe.back_reflectivity = back_reflectivity
             probe.theta_offset.value = theta_offset
             probe.back_absorption.value = back_absorption
@@ -395,3 +395,59 @@ PyObject* Pconvolve_sampled(PyObject *obj, PyObject *args)
   return Py_BuildValue("");
 }
 
+PyObject* PdTdL2dQ(PyObject *obj, PyObject *args)
+{
+  PyObject *T_obj,*dT_obj,*L_obj,*dL_obj,*dQ_obj;
+  const double *T, *dT, *L, *dL;
+  double *dQ;
+  Py_ssize_t nT, ndT, nL, ndL, ndQ;
+  DECLARE_VECTORS(5);
+
+  if (!PyArg_ParseTuple(args, "OOOOO:dTdL2dQ",
+			&T_obj,&dT_obj,&L_obj,&dL_obj,&dQ_obj)) return NULL;
+  INVECTOR(T_obj,T,nT);
+  INVECTOR(dT_obj,dT,ndT);
+  INVECTOR(L_obj,L,nL);
+  INVECTOR(dL_obj,dL,ndL);
+  OUTVECTOR(dQ_obj,dQ,ndQ);
+  if ((nT != 1 && nT != ndQ) || (ndT != 1 && ndT != ndQ)
+      || (nL != 1 && nL != ndQ) || (ndL != 1 && ndL != ndQ)) {
+#ifndef BROKEN_EXCEPTIONS
+    PyErr_SetString(PyExc_ValueError, "dTdL2dQ: T, dT, L and dL must have length 1 or len(dQ)");
+#endif
+    FREE_VECTORS();
+    return NULL;
+  }
+  dTdL2dQ(ndQ,nT,T,ndT,dT,nL,L,ndL,dL,dQ);
+  FREE_VECTORS();
+  return Py_BuildValue("");
+}
+
+PyObject* Pdivergence(PyObject *obj, PyObject *args)
+{
+  PyObject *T_obj,*s1_obj,*s2_obj,*dT_obj;
+  const double *T, *s1, *s2;
+  double *dT;
+  double d1, d2, sample_width, sample_broadening;
+  Py_ssize_t nT, ns1, ns2, ndT;
+  DECLARE_VECTORS(4);
+
+  if (!PyArg_ParseTuple(args, "OOOddddO:divergence",
+			&T_obj,&s1_obj,&s2_obj,&d1,&d2,&sample_width,
+			&sample_broadening,&dT_obj)) return NULL;
+  INVECTOR(T_obj,T,nT);
+  INVECTOR(s1_obj,s1,ns1);
+  INVECTOR(s2_obj,s2,ns2);
+  OUTVECTOR(dT_obj,dT,ndT);
+  if (nT != ndT || (ns1 != 1 && ns1 != ndT) || (ns2 != 1 && ns2 != ndT)) {
+#ifndef BROKEN_EXCEPTIONS
+    PyErr_SetString(PyExc_ValueError, "divergence: T must have length len(dT) and s1, s2 length 1 or len(dT)");
+#endif
+    FREE_VECTORS();
+    return NULL;
+  }
+  divergence(ndT,T,ns1,s1,ns2,s2,d1,d2,sample_width,sample_broadening,dT);
+  FREE_VECTORS();
+  return Py_BuildValue("");
+}
+
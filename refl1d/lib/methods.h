@@ -106,3 +106,5 @@ PyObject* Pcontract_by_area(PyObject*obj,PyObject*args);
 PyObject* Pcontract_mag(PyObject*obj,PyObject*args);
 PyObject* Pconvolve(PyObject*obj,PyObject*args);
 PyObject* Pconvolve_sampled(PyObject*obj,PyObject*args);
+PyObject* PdTdL2dQ(PyObject*obj,PyObject*args);
+PyObject* Pdivergence(PyObject*obj,PyObject*args);
@@ -166,6 +166,17 @@ convolve_sampled(size_t Nin, const double xin[], const double yin[],
          size_t Np, const double xp[], const double yp[],
          size_t N, const double x[], const double dx[], double y[]);
 
+void
+dTdL2dQ(size_t N, size_t nT, const double T[], size_t ndT, const double dT[],
+        size_t nL, const double L[], size_t ndL, const double dL[],
+        double dQ[]);
+
+void
+divergence(size_t N, const double T[],
+           size_t ns1, const double s1[], size_t ns2, const double s2[],
+           double d1, double d2, double sample_width,
+           double sample_broadening, double dT[]);
+
 #ifdef __cplusplus
 }
 #endif
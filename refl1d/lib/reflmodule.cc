@@ -128,6 +128,16 @@ static PyMethodDef methods[] = {
 	 METH_VARARGS,
 	 "convolve_sampled(xi,yi,xp,yp,x,dx,y): compute convolution with sampled\ndistribution of width dx[k] at points x[k], returned in y[k]"},
 
+	{"_dTdL2dQ",
+	 PdTdL2dQ,
+	 METH_VARARGS,
+	 "_dTdL2dQ(T,dT,L,dL,dQ): compute 1-sigma Q resolution putting it into vector dQ; inputs have length 1 or len(dQ)"},
+
+	{"_divergence",
+	 Pdivergence,
+	 METH_VARARGS,
+	 "_divergence(T,s1,s2,d1,d2,sample_width,sample_broadening,dT): compute FWHM angular divergence putting it into vector dT of len(T); s1 and s2 have length 1 or len(T)"},
+
 	{"rebin_uint8",
 	 &Prebin<uint8_t>,
 	 METH_VARARGS,
@@ -0,0 +1,70 @@
+/* This program is public domain. */
+
+#include <math.h>
+#include <stddef.h>
+
+/* Computed using extended precision with Octave's symbolic toolbox. */
+#define PI4          12.56637061435917295385
+#define PI_180        0.01745329251994329576
+#define LN256         5.54517744447956247533
+
+/** \file
+Angular divergence and Q resolution for reflectometry probes.
+
+These mirror dTdL2dQ and divergence in refl1d/resolution.py, computing
+the result in a single pass over the inputs without numpy temporaries.
+
+We provide the following functions:
+   dTdL2dQ(N, nT, T, ndT, dT, nL, L, ndL, dL, dQ)  returns 1-sigma dQ
+   divergence(N, T, ns1, s1, ns2, s2, d1, d2, w, broadening, dT) returns FWHM dT
+
+where
+   N is the number of output points
+   T, dT are the angle and FWHM angular divergence in degrees
+   L, dL are the wavelength and FWHM wavelength dispersion in Angstroms
+   s1, s2 are the slit openings and d1, d2 the slit distances in mm
+   w is the sample width in mm
+   broadening is the FWHM sample broadening in degrees
+
+The lengths nT, ndT, nL, ndL, ns1, ns2 are either N or 1, with length 1 vectors
+being used for every output point.
+*/
+
+void
+dTdL2dQ(size_t N, size_t nT, const double T[], size_t ndT, const double dT[],
+        size_t nL, const double L[], size_t ndL, const double dL[],
+        double dQ[])
+{
+  const double FWHM = sqrt(LN256);
+  const size_t sT = (nT != 1), sdT = (ndT != 1);
+  const size_t sL = (nL != 1), sdL = (ndL != 1);
+  size_t i;
+
+  for (i=0; i < N; i++) {
+    const double t = PI_180*T[i*sT];
+    const double dt = PI_180*dT[i*sdT];
+    const double Li = L[i*sL];
+    const double a = sin(t)*dL[i*sdL]/Li;
+    const double b = cos(t)*dt;
+    dQ[i] = (PI4/Li)*sqrt(a*a + b*b)/FWHM;
+  }
+}
+
+void
+divergence(size_t N, const double T[],
+           size_t ns1, const double s1[], size_t ns2, const double s2[],
+           double d1, double d2, double sample_width,
+           double sample_broadening, double dT[])
+{
+  const size_t ss1 = (ns1 != 1), ss2 = (ns2 != 1);
+  size_t i;
+
+  for (i=0; i < N; i++) {
+    const double s1i = s1[i*ss1], s2i = s2[i*ss2];
+    /* For small samples, use the sample projection instead. */
+    const double sample_s = sample_width*sin(PI_180*T[i]);
+    const double dTi = (sample_s < s2i ? 0.5*(s1i+sample_s)/d1
+                                       : 0.5*(s1i+s2i)/(d1-d2))/PI_180;
+    dT[i] = dTi + sample_broadening;
+  }
+}
@@ -198,6 +198,8 @@ class Probe(object):
             theta_offset, name="theta_offset"+qualifier)
         self.sample_broadening = Parameter.default(
             sample_broadening, name="sample_broadening"+qualifier)
+        # Width independent terms of the sample broadening; see dQ
+        self._dQ_broadening_cache = {}
         self.back_reflectivity = back_reflectivity
         if data is not None:
             R, dR = data
@@ -394,8 +396,11 @@ class Probe(object):
         if self.sample_broadening.value == 0:
             dQ = self.dQo
         else:
+            # Only the width changes between fit steps, so keep the rest
+            # of the broadening calculation with the probe.
             dQ = dQ_broadening(dQ=self.dQo, L=self.L, T=self.T, dT=self.dT,
-                               width=self.sample_broadening.value)
+                               width=self.sample_broadening.value,
+                               cache=self._dQ_broadening_cache)
         return dQ
 
     @dQ.setter
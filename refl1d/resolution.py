@@ -3,9 +3,95 @@ Resolution calculations
 
 """
 
-from numpy import pi, sqrt, log, degrees, radians, cos, sin, tan
-from numpy import arcsin as asin, ceil
-from numpy import ones_like, arange, isscalar, asarray, hstack
+import math
+
+import numpy as np
+from numpy import pi, sqrt, log, cos, sin, tan
+from numpy import arcsin as asin
+from numpy import isscalar, asarray, empty
+
+try:
+    from . import reflmodule
+except ImportError:
+    reflmodule = None
+# A reflmodule built from older sources imports fine but lacks the
+# resolution kernels, so look them up individually.
+_c_dTdL2dQ = getattr(reflmodule, '_dTdL2dQ', None)
+_c_divergence = getattr(reflmodule, '_divergence', None)
+
+# Angle conversion factors; multiplying by these folds into the surrounding
+# expression rather than dispatching separate radians/degrees ufuncs.
+_DEG2RAD = pi/180.
+_RAD2DEG = 180./pi
+
+
+def _asfloat(v):
+    """
+    Convert *v* to a float array, leaving single precision input as is.
+
+    Resolution only needs a few digits, so float32 probe data can stay in
+    float32 and move half the bytes.  Constants used with these arrays are
+    python floats so that they do not promote the result to double.
+    """
+    v = asarray(v)
+    return v if v.dtype == np.float32 else asarray(v, 'd')
+
+
+def _dense(v):
+    """
+    Return *v* as a contiguous double vector for the C library.
+    """
+    return np.ascontiguousarray(v, 'd').ravel()
+
+
+def _slit_vector(s, n):
+    """
+    Return True if slit *s* is a scalar or a vector of length 1 or *n*.
+    """
+    return np.ndim(s) == 0 or (np.ndim(s) == 1 and len(s) in (1, n))
+
+
+# Below this length the numba dispatch overhead costs more than the numpy
+# temporaries it saves, so short probe vectors stay with numpy.
+_KERNEL_MIN_SIZE = 10000
+_kernels = None
+def _numba_kernels():
+    """
+    Return a dict of the numba resolution kernels, or {} without numba.
+
+    numba is optional and takes longer to import than the rest of refl1d,
+    so it is not loaded until a vector long enough to use it comes along.
+    The kernels are cached on disk so the JIT cost is only paid once per
+    install.
+    """
+    global _kernels
+    if _kernels is not None:
+        return _kernels
+    try:
+        from numba import njit, types
+    except ImportError:
+        _kernels = {}
+        return _kernels
+
+    # Slit settings are converted to float by the caller, so the one eager
+    # signature covers every call and nothing is compiled on first use.
+    vector, real = types.float64[:], types.float64
+    readonly = types.Array(types.float64, 1, 'A', readonly=True)
+    @njit(types.void(readonly, real, real, real, real, real, real, real, real,
+                     vector, vector),
+          fastmath=True, cache=True)
+    def slit_widths_kernel(T, b1, b2, m1, m2, t1, t2, Tlo, Thi, s1, s2):
+        for i in range(T.size):
+            absT = abs(T[i])
+            if absT > Thi:
+                s1[i], s2[i] = t1, t2
+            elif absT < Tlo:
+                s1[i], s2[i] = b1, b2
+            else:
+                s1[i], s2[i] = m1*absT/Tlo, m2*absT/Tlo
+
+    _kernels = dict(slit_widths=slit_widths_kernel)
+    return _kernels
 
 
 def QL2T(Q=None, L=None):
@@ -19,7 +105,7 @@ def QL2T(Q=None, L=None):
     Returns $\theta$\ |deg|.
     """
     Q, L = asarray(Q, 'd'), asarray(L, 'd')
-    return degrees(asin(abs(Q) * L / (4*pi)))
+    return asin(abs(Q) * L / (4*pi)) * _RAD2DEG
 
 
 def QT2L(Q=None, T=None):
@@ -32,8 +118,8 @@ def QT2L(Q=None, T=None):
 
     Returns $\lambda$\ |Ang|.
     """
-    Q, T = asarray(Q, 'd'), radians(asarray(T, 'd'))
-    return 4 * pi * sin(T) / Q
+    Q, T = asarray(Q, 'd'), asarray(T, 'd')
+    return 4 * pi * sin(T*_DEG2RAD) / Q
 
 
 def TL2Q(T=None, L=None):
@@ -46,11 +132,11 @@ def TL2Q(T=None, L=None):
 
     Returns $Q$ |1/Ang|
     """
-    T, L = radians(asarray(T, 'd')), asarray(L, 'd')
-    return 4 * pi * sin(T) / L
+    T, L = asarray(T, 'd'), asarray(L, 'd')
+    return 4 * pi * sin(T*_DEG2RAD) / L
 
 
-_FWHM_scale = sqrt(log(256))
+_FWHM_scale = float(sqrt(log(256)))
 def FWHM2sigma(s):
     return s/_FWHM_scale
 
@@ -87,8 +173,17 @@ def dTdL2dQ(T=None, dT=None, L=None, dL=None):
     """
 
     # Compute dQ from wavelength dispersion (dL) and angular divergence (dT)
-    T, dT = radians(asarray(T, 'd')), radians(asarray(dT, 'd'))
-    L, dL = asarray(L, 'd'), asarray(dL, 'd')
+    T, dT = _asfloat(T), _asfloat(dT)
+    L, dL = _asfloat(L), _asfloat(dL)
+    vector = max(T.ndim, dT.ndim, L.ndim, dL.ndim) == 1
+    if (_c_dTdL2dQ is not None and vector
+            and np.result_type(T, dT, L, dL) == np.float64):
+        # Compiled kernel; scalar arguments are passed as length 1 vectors.
+        dQ = empty(np.broadcast(T, dT, L, dL).shape, 'd')
+        _c_dTdL2dQ(_dense(T), _dense(dT), _dense(L), _dense(dL), dQ)
+        return dQ
+
+    T, dT = T*_DEG2RAD, dT*_DEG2RAD
     #print T, dT, L, dL
     dQ = (4*pi/L) * sqrt((sin(T)*dL/L)**2 + (cos(T)*dT)**2)
 
@@ -96,7 +191,7 @@ def dTdL2dQ(T=None, dT=None, L=None, dL=None):
     return FWHM2sigma(dQ)
 
 
-def dQ_broadening(dQ, L, T, dT, width):
+def dQ_broadening(dQ, L, T, dT, width, cache=None):
     r"""
     Broaden an existing dQ by the given divergence.
 
@@ -104,15 +199,34 @@ def dQ_broadening(dQ, L, T, dT, width):
     *L* |Ang|
     *T*, *dT* |deg|, with FWHM angular divergence
     *width* |deg|, with FWHM increased angular divergence
+    *cache* dict, or None, for reusing terms between calls
 
     The calculation is derived by substituting
     $\Delta\theta' = \Delta\theta + \omega$ for sample broadening $\omega$.
+
+    When fitting sample broadening, the same vectors are broadened by a
+    different *width* on every step.  Pass an empty dict as *cache* on the
+    first call and the same dict afterward to skip recomputing the terms
+    which do not depend on *width*.  The cache is keyed on the identity of
+    *dQ*, *L*, *T* and *dT*, so it is refreshed when any of them is
+    replaced, but not if they are modified in place.
     """
-    T, dT = radians(asarray(T, 'd')), FWHM2sigma(radians(asarray(dT, 'd')))
-    width = FWHM2sigma(radians(width))
-    dQsq = dQ**2 + (4*pi/L*cos(T))**2*(2*width*dT + width**2)
+    key = (dQ, L, T, dT)
+    cached = cache.get('key', ()) if cache is not None else ()
+    if len(cached) == len(key) and all(a is b for a, b in zip(cached, key)):
+        dQsq, linear, quadratic = cache['terms']
+    else:
+        T, dT = asarray(T, 'd')*_DEG2RAD, FWHM2sigma(asarray(dT, 'd')*_DEG2RAD)
+        quadratic = (4*pi/L*cos(T))**2
+        linear = 2*dT*quadratic
+        dQsq = dQ**2
+        if cache is not None:
+            cache['key'] = key
+            cache['terms'] = dQsq, linear, quadratic
 
-    return sqrt(dQsq)
+    # dQ'^2 = dQ^2 + (4 pi cos(T)/L)^2 (2 width dT + width^2)
+    width = FWHM2sigma(width*_DEG2RAD)
+    return sqrt(dQsq + width*(linear + width*quadratic))
 
 
 def dQdT2dLoL(Q, dQ, T, dT):
@@ -125,10 +239,11 @@ def dQdT2dLoL(Q, dQ, T, dT):
 
     Returns FWHM $\Delta\lambda/\lambda$
     """
-    T, dT = radians(asarray(T, 'd')), radians(asarray(dT, 'd'))
+    T, dT = asarray(T, 'd')*_DEG2RAD, asarray(dT, 'd')*_DEG2RAD
     Q, dQ = asarray(Q, 'd'), asarray(dQ, 'd')
     dQoQ = sigma2FWHM(dQ)/Q
-    dToT = dT/tan(T)
+    # Use cos/sin rather than 1/tan, matching the form in dTdL2dQ
+    dToT = dT*cos(T)/sin(T)
     if (dQoQ < dToT).any():
         raise ValueError("Cannot infer wavelength resolution: dQ is too small or dT is too large for some data points")
     return sqrt(dQoQ**2 - dToT**2)
@@ -146,12 +261,12 @@ def dQdL2dT(Q, dQ, L, dL):
     """
     L, dL = asarray(L, 'd'), asarray(dL, 'd')
     Q, dQ = asarray(Q, 'd'), asarray(dQ, 'd')
-    T = radians(QL2T(Q, L))
+    T = asin(abs(Q) * L / (4*pi))
     dQoQ = sigma2FWHM(dQ)/Q
     dLoL = dL/L
     if (dQoQ < dLoL).any():
         raise ValueError("Cannot infer angular resolution: dQ is too small or dL is too large for some data points")
-    dT = degrees(sqrt(dQoQ**2 - dLoL**2) * tan(T))
+    dT = sqrt(dQoQ**2 - dLoL**2) * tan(T) * _RAD2DEG
     return dT
 
 
@@ -183,13 +298,27 @@ def bins(low, high, dLoL):
     *dLoL* is the desired resolution FWHM $\Delta\lambda/\lambda$ for the bins.
     """
 
-    step = 1 + dLoL
-    n = ceil(log(high/low)/log(step))
-    edges = low*step**arange(n+1)
+    # Bin count from scalar math; log1p keeps precision for the small dLoL
+    # (1-2%) typical of TOF binning.
+    n = math.ceil(math.log(high/low)/math.log1p(dLoL))
+    # Edges grow geometrically, so accumulate the ratio with a running product
+    edges = empty(n+1)
+    edges[0] = low
+    edges[1:] = 1 + dLoL
+    np.cumprod(edges, out=edges)
     L = (edges[:-1]+edges[1:])/2
     return L
 
 
+def _bin_resolution(L):
+    r"""
+    Return the fixed $\omega = \Delta\lambda/\lambda$ of the bin centers *L*,
+    which may be in increasing or decreasing order.
+    """
+    ratio = L[1:]/L[:-1] if L[1] > L[0] else L[:-1]/L[1:]
+    return (np.median(ratio) if len(ratio) > 1 else ratio[0]) - 1
+
+
 def binwidths(L):
     r"""
     Determine the wavelength dispersion from bin centers *L*.
@@ -206,10 +335,7 @@ def binwidths(L):
 
     where $E$ and $\omega$ are as defined in :func:`binedges`.
     """
-    if L[1] > L[0]:
-        dLoL = L[1]/L[0] - 1
-    else:
-        dLoL = L[0]/L[1] - 1
+    dLoL = _bin_resolution(L)
     dL = 2*dLoL/(2+dLoL)*L
     return dL
 
@@ -257,15 +383,16 @@ def binedges(L):
                                   { (E_i(1+\omega)+E_i }
                           = \frac{E_{i+1}}{E_i}
                           = \frac{E_i(1+\omega)}{E_i} = 1 + \omega
+
+    Rather than trusting a single pair, $\omega$ is taken from the median
+    ratio so that noise in any one bin center does not skew every edge.
     """
-    if L[1] > L[0]:
-        dLoL = L[1]/L[0] - 1
-        last = (1+dLoL)
-    else:
-        dLoL = L[0]/L[1] - 1
-        last = 1./(1+dLoL)
-    E = L*2/(2+dLoL)
-    return hstack((E, E[-1]*last))
+    dLoL = _bin_resolution(L)
+    last = (1+dLoL) if L[1] > L[0] else 1./(1+dLoL)
+    E = empty(len(L)+1, dtype=np.result_type(L, 1.))
+    E[:-1] = L*(2./(2+dLoL))
+    E[-1] = E[-2]*last
+    return E
 
 
 def divergence(T=None, slits=None, distance=None,
@@ -338,20 +465,37 @@ def divergence(T=None, slits=None, distance=None,
     except TypeError:
         s1 = s2 = slits
 
+    T = _asfloat(T)
+
+    # With the default (effectively infinite) sample the projection at the
+    # lowest angle already covers slit 2, so there is no need to compute the
+    # projection at every angle.  sin is monotonic over [-90, 90] degrees.
+    if (T.size and isscalar(sample_width)
+            and sample_width*sin(T.min()*_DEG2RAD) >= np.max(s2)):
+        dT = 0.5*(s1+s2)/(d1-d2) * _RAD2DEG + sample_broadening
+        return dT if T.ndim == 0 else np.full_like(T, dT)
+
+    if (_c_divergence is not None and T.ndim == 1 and T.dtype == np.float64
+            and _slit_vector(s1, T.size) and _slit_vector(s2, T.size)
+            and isscalar(d1) and isscalar(d2)
+            and isscalar(sample_width) and isscalar(sample_broadening)):
+        # Compiled kernel; scalar slits are passed as length 1 vectors.
+        dT = empty(T.shape, 'd')
+        _c_divergence(_dense(T), _dense(s1), _dense(s2), d1, d2,
+                      sample_width, sample_broadening, dT)
+        return dT
+
     # Compute FWHM angular divergence dT from the slits in degrees
-    dT = degrees(0.5*(s1+s2)/(d1-d2))
+    dT = 0.5*(s1+s2)/(d1-d2) * _RAD2DEG
 
     # For small samples, use the sample projection instead.
-    sample_s = sample_width * sin(radians(T))
+    sample_s = sample_width * sin(T*_DEG2RAD)
     if isscalar(sample_s):
         if sample_s < s2:
-            dT = degrees(0.5*(s1+sample_s)/d1)
+            dT = 0.5*(s1+sample_s)/d1 * _RAD2DEG
     else:
-        idx = sample_s < s2
         #print s1, s2, d1, d2, T, dT, sample_s
-        s1 = ones_like(sample_s)*s1
-        dT = ones_like(sample_s)*dT
-        dT[idx] = degrees(0.5*(s1[idx] + sample_s[idx])/d1)
+        dT = np.where(sample_s < s2, 0.5*(s1+sample_s)/d1 * _RAD2DEG, dT)
 
     return dT + sample_broadening
 
@@ -400,17 +544,12 @@ def slit_widths(T=None, slits_at_Tlo=None, Tlo=90, Thi=90,
         b1, b2 = slits_below
     except TypeError:
         b1 = b2 = slits_below
-    s1 = ones_like(T) * b1
-    s2 = ones_like(T) * b2
 
     # Slits at Tlo<=T<=Thi
     try:
         m1, m2 = slits_at_Tlo
     except TypeError:
         m1 = m2 = slits_at_Tlo
-    idx = abs(T) >= Tlo
-    s1[idx] = m1 * T[idx]/Tlo
-    s2[idx] = m2 * T[idx]/Tlo
 
     # Slits at T > Thi
     if slits_above is None:
@@ -419,9 +558,22 @@ def slit_widths(T=None, slits_at_Tlo=None, Tlo=90, Thi=90,
         t1, t2 = slits_above
     except TypeError:
         t1 = t2 = slits_above
-    idx = abs(T) > Thi
-    s1[idx] = t1
-    s2[idx] = t2
+
+    T = _asfloat(T)
+    kernel = (_numba_kernels().get('slit_widths')
+              if T.ndim == 1 and T.size >= _KERNEL_MIN_SIZE
+              and T.dtype == np.float64 else None)
+    if kernel is not None:
+        s1, s2 = empty(T.shape, 'd'), empty(T.shape, 'd')
+        kernel(T, float(b1), float(b2), float(m1), float(m2),
+               float(t1), float(t2), float(Tlo), float(Thi), s1, s2)
+        return s1, s2
+
+    # Fill each slit in one pass; T > Thi takes precedence over T < Tlo.
+    absT, real = abs(T), T.dtype.type
+    regions = [absT > Thi, absT < Tlo]
+    s1 = np.select(regions, [real(t1), real(b1)], default=m1*absT/Tlo)
+    s2 = np.select(regions, [real(t2), real(b2)], default=m2*absT/Tlo)
 
     return s1, s2
 
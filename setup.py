@@ -54,7 +54,7 @@ def reflmodule_config():
     S = ("reflmodule.cc", "methods.cc",
          "reflectivity.cc", "magnetic.cc",
          "contract_profile.cc",
-         "convolve.c", "convolve_sampled.c",
+         "convolve.c", "convolve_sampled.c", "resolution.c",
         )
 
     Sdeps = ("erf.c", "methods.h", "rebin.h", "rebin2D.h", "reflcalc.h")
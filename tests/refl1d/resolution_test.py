@@ -21,6 +21,28 @@ def test():
     dQ1 = res.dTdL2dQ(T=T, dT=dT, L=L, dL=dL)
     assert norm(res.dQdT2dLoL(Q=Q1, dQ=dQ1, T=T, dT=dT) -
                 sqrt((dQ1*FWHM/Q1)**2 - (dTrad/tan(Trad))**2)) < 1e-14
+    # Resolution cannot be inferred for negative Q
+    for convert, args in ((res.dQdT2dLoL, (T, dT)), (res.dQdL2dT, (L, dL))):
+        try:
+            convert(-Q1, dQ1, *args)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("negative Q accepted by %s"%convert.__name__)
+
+    # Sample broadening, with the width independent terms cached
+    cache = {}
+    for width in (0.01, 0.02):
+        dQb = sqrt(dQ1**2 + (4*pi/L*cos(Trad))**2
+                   * (2*radians(width)*dTrad + radians(width)**2)/FWHM**2)
+        assert norm(res.dQ_broadening(dQ1, L, T, dT, width, cache=cache)
+                    - dQb) < 1e-14
+
+    # Single precision inputs give single precision resolution
+    Tf = np.array([T, 2*T], 'f')
+    dQf = res.dTdL2dQ(T=Tf, dT=np.float32(dT), L=np.float32(L), dL=np.float32(dL))
+    assert dQf.dtype == np.float32
+    assert norm(dQf - res.dTdL2dQ(T=[T, 2*T], dT=dT, L=L, dL=dL)) < 1e-7
 
     # For spallation sources, bin edges are at A r**n where r is 1+resolution.
     # Bin edges from 1 to 2 at 20% [1, 1.2, 1.44, 1.728, 2.0736]
@@ -29,6 +51,12 @@ def test():
     dLp = res.binwidths(Lp)
     assert norm(Lp-[1.1, 1.32, 1.584, 1.9008]) < 1e-14
     assert norm(dLp-[0.2, 0.24, 0.288, 0.3456]) < 1e-14
+    # A perturbed first center does not change the resolution of the bins
+    Lp = res.bins(1, 10, 0.2)
+    Lp[0] *= 1.01
+    assert norm(res.binwidths(Lp)/Lp - 2*0.2/2.2) < 1e-14
+    edges = res.binedges(Lp)
+    assert norm(edges[2:]/edges[1:-1] - 1.2) < 1e-14
 
     # Slit openings are assumed to be linear in angle; since footprint
     # goes as the sine of the angle, this is correct in the small angle
@@ -39,6 +67,14 @@ def test():
     slits = (sbelow, sTlo, sTlo*(Tlo+Thi)/2/Tlo, sTlo*Thi/Tlo, sabove)
     assert norm(res.slit_widths(T=Ts, slits_at_Tlo=sTlo, Tlo=Tlo, Thi=Thi,
                 slits_below=sbelow, slits_above=sabove)[0]-slits) < 1e-14
+    # Negative angles open the slits the same as positive angles, both for
+    # short vectors and for vectors long enough to use the numba kernel.
+    Tsigned, ssigned = np.hstack((Ts, -Ts)), np.hstack((slits, slits))
+    for n in (1, res._KERNEL_MIN_SIZE//len(Tsigned) + 1):
+        assert norm(res.slit_widths(T=np.tile(Tsigned, n), slits_at_Tlo=sTlo,
+                                    Tlo=Tlo, Thi=Thi, slits_below=sbelow,
+                                    slits_above=sabove)[0]
+                    - np.tile(ssigned, n)) < 1e-12
 
     # FWHM angular divergence is average slit opening / slit separation
     # For tiny samples, use the sample itself as a slit.
@@ -52,6 +88,31 @@ def test():
                                sample_broadening=broadening) - (expected+broadening)) < 1e-14
     assert norm(res.divergence(T=T, slits=(s1, s2), distance=(d1, d2),
                                sample_width=1) - degrees((s1+sin(Trad))/(2*d1))) < 1e-14
+    # Vector angles, with the sample limiting the beam at the low angles
+    Tv = np.array([0.01, 0.5, 5.])
+    width = 10
+    proj = width*np.sin(np.radians(Tv))
+    expected = np.where(proj < s2, np.degrees((s1+proj)/(2*d1)), degrees(savg/d))
+    assert norm(res.divergence(T=Tv, slits=(s1, s2), distance=(d1, d2),
+                               sample_width=width, sample_broadening=broadening)
+                - (expected+broadening)) < 1e-14
+    # Slits and sample broadening may vary with angle
+    s1v, s2v, bv = s1*Tv, s2*Tv, broadening*Tv
+    proj = width*np.sin(np.radians(Tv))
+    expected = np.where(proj < s2v, np.degrees((s1v+proj)/(2*d1)),
+                        np.degrees((s1v+s2v)/(2*d)))
+    assert norm(res.divergence(T=Tv, slits=(s1v, s2v), distance=(d1, d2),
+                               sample_width=width, sample_broadening=bv)
+                - (expected+bv)) < 1e-14
+    # Sample width may vary with angle as well
+    wv = np.array([1e6, 1e6, 1])
+    proj = wv*np.sin(np.radians(Tv))
+    expected = np.where(proj < s2, np.degrees((s1+proj)/(2*d1)), degrees(savg/d))
+    assert norm(res.divergence(T=Tv, slits=(s1, s2), distance=(d1, d2),
+                               sample_width=wv) - expected) < 1e-14
+    assert norm(res.dTdL2dQ(T=Tv, dT=dT, L=L, dL=dL) - 4*pi/L
+                * np.sqrt((np.sin(np.radians(Tv))*dL/L)**2
+                          + (np.cos(np.radians(Tv))*dTrad)**2)/FWHM) < 1e-14
 
     # Simulate an scanning reflectometer
     mono = inst.Monochromatic(d_s1=d1, d_s2=d2, wavelength=L, dLoL=dL/L,
@@ -113,6 +174,18 @@ def test():
     assert isinstance(str(poly), type(""))
     assert isinstance(snsdata.Liquids.defaults(), type(""))
 
+    # Probes for all angles at once match the probes for each angle
+    Tp = [0.3, 0.7, 1.5]
+    for slits in ([0.1, 0.2, 0.4], [(0.1, 0.15), (0.2, 0.3), (0.4, 0.6)]):
+        for kw in ({}, dict(sample_width=10, sample_broadening=broadening),
+                   dict(wavelength=(2, 5), dLoL=0.05)):
+            liquids = snsdata.Liquids()
+            probes = liquids._probes(T=Tp, slits=slits, **kw)
+            for Ti, si, p in zip(Tp, slits, probes):
+                q = liquids.probe(T=Ti, slits=si, **kw)
+                for attr in ('T', 'dT', 'L', 'dL', 'Q', 'dQ'):
+                    assert (getattr(p, attr) == getattr(q, attr)).all(), attr
+
     # Make sure that the string reps don't crash
     _ = (str(mono), str(ncnrdata.NG1.defaults()), str(ncnrdata.NG1()),
          str(poly), str(snsdata.Liquids.defaults()))